@@ -13,38 +13,81 @@ Output:
     arc_bookmarks.html - Import this file into your browser
 """
 
-import json
 import html
+import json
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson  # Optional: much faster parsing of large sidebar files
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+# Characters that html.escape() would replace
+HTML_UNSAFE_RE = re.compile('[&<>"\']')
 
+# Fixed markup of the bookmarks file; %s slots take escaped UTF-8 bytes
+DOCUMENT_HEADER = (
+    b'<!DOCTYPE NETSCAPE-Bookmark-file-1>\n'
+    b'<!-- Exported from Arc Browser using arc_to_bookmarks.py -->\n'
+    b'<!-- Export date: %s -->\n'
+    b'<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">\n'
+    b'<TITLE>Arc Bookmarks</TITLE>\n'
+    b'<H1>Arc Bookmarks</H1>\n'
+    b'<DL><p>\n'
+)
+DOCUMENT_FOOTER = b'</DL><p>'
+SPACE_HEADER = (
+    b'    <DT><H3>%s</H3>\n'
+    b'    <DL><p>\n'
+)
+SPACE_FOOTER = b'    </DL><p>\n'
+SPACE_TAB = b'        <DT><A HREF="%s">%s</A>\n'
+FOLDER_HEADER = (
+    b'        <DT><H3>%s</H3>\n'
+    b'        <DL><p>\n'
+)
+FOLDER_FOOTER = b'        </DL><p>\n'
+FOLDER_TAB = b'            <DT><A HREF="%s">%s</A>\n'
 
-def get_default_arc_path():
+
+def get_default_arc_path() -> Optional[Path]:
     """Get the default Arc browser data path based on OS"""
     if sys.platform == "darwin":  # macOS
         return Path.home() / "Library/Application Support/Arc/StorableSidebar.json"
     elif sys.platform == "win32":  # Windows
         local_app_data = os.environ.get("LOCALAPPDATA", "")
         arc_path = Path(local_app_data) / "Packages"
-        # Find the Arc folder (name varies)
-        for folder in arc_path.glob("TheBrowserCompany.Arc*"):
-            json_path = folder / "LocalCache/Local/Arc/StorableSidebar.json"
-            if json_path.exists():
-                return json_path
+        # Find the Arc folder (name varies), stopping at the first match
+        try:
+            with os.scandir(arc_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith("TheBrowserCompany.Arc"):
+                        json_path = Path(entry.path) / "LocalCache/Local/Arc/StorableSidebar.json"
+                        if json_path.exists():
+                            return json_path
+        except OSError:
+            pass
         return None
     else:
         return None
 
 
-def load_arc_data(filepath):
+def load_arc_data(filepath: Union[str, Path]) -> Dict[str, Any]:
     """Load and parse the Arc StorableSidebar.json file"""
+    if orjson is not None:
+        return orjson.loads(Path(filepath).read_bytes())
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
-def get_item_type(item):
+def get_item_type(item: Dict[str, Any]) -> Optional[str]:
     """Determine if an item is a folder or tab"""
     if 'data' not in item:
         return None
@@ -55,65 +98,161 @@ def get_item_type(item):
     return None
 
 
-def escape_html_text(text):
+def escape_html_text(text: Any) -> str:
     """Safely escape HTML characters"""
-    return html.escape(str(text)) if text else ''
+    if not text:
+        return ''
+    text = text if type(text) is str else str(text)
+    # Most URLs and titles need no escaping, so skip the copy for them
+    if HTML_UNSAFE_RE.search(text) is None:
+        return text
+    return html.escape(text)
 
 
-def get_folder_with_direct_tabs(item_id, items_by_id):
-    """Get a folder with only its direct tab children (not subfolders)"""
-    if item_id not in items_by_id:
-        return None
+def encode_html_text(text: Any) -> bytes:
+    """Escape text for HTML and encode it as UTF-8 for the output buffer"""
+    if not text:
+        return b''
+    return encode_html_str(text if type(text) is str else str(text))
+
+
+@lru_cache(maxsize=8192)
+def encode_html_str(text: str) -> bytes:
+    """Escape and encode a string, caching titles and URLs that repeat across folders"""
+    return escape_html_text(text).encode('utf-8')
+
+
+def write_folders_flat(
+    item_id: str,
+    items_by_id: Dict[str, Dict[str, Any]],
+    types: Dict[str, Optional[str]],
+    buf: bytearray,
+) -> Tuple[int, int]:
+    """Write all folders (including nested) to buf as a flat list, depth first
     
-    item = items_by_id[item_id]
-    if get_item_type(item) != 'folder':
-        return None
+    Returns a (folders, bookmarks) tuple with the number of each written.
+    """
+    total_folders = 0
+    total_bookmarks = 0
+    if types.get(item_id) != 'folder':
+        return total_folders, total_bookmarks
     
-    tabs = []
-    for child_id in item.get('childrenIds', []):
-        if child_id in items_by_id:
-            child = items_by_id[child_id]
-            if get_item_type(child) == 'tab':
+    # Bind hot-loop lookups to locals
+    append = buf.extend
+    esc = encode_html_text
+    get_type = types.get
+    folder_header = FOLDER_HEADER
+    folder_tab = FOLDER_TAB
+    
+    # Walk with an explicit stack of (folder, depth) so deep hierarchies can't
+    # hit the recursion limit. path holds the folders from the root down to the
+    # current one; a folder that is its own ancestor means a cycle in corrupt
+    # data and is skipped. Folders reachable along several paths are written
+    # once per path, as before.
+    stack = [(item_id, 0)]
+    pop = stack.pop
+    path: List[str] = []
+    while stack:
+        folder_id, depth = pop()
+        del path[depth:]
+        if folder_id in path:
+            continue
+        path.append(folder_id)
+        item = items_by_id[folder_id]
+        
+        # Write the header up front and drop it again if no tabs follow
+        start = len(buf)
+        append(folder_header % esc(item.get('title') or 'Untitled Folder'))
+        
+        # Write direct tabs and collect subfolders in a single pass
+        tab_count = 0
+        subfolders = []
+        for child_id in item.get('childrenIds', []):
+            child_type = get_type(child_id)
+            if child_type == 'folder':
+                subfolders.append(child_id)
+            elif child_type == 'tab':
+                child = items_by_id[child_id]
                 tab_data = child['data']['tab']
-                url = tab_data.get('savedURL', '')
-                title = child.get('title') or tab_data.get('savedTitle', '') or 'Untitled'
-                if url:
-                    tabs.append({'title': title, 'url': url})
+                url = tab_data.get('savedURL')
+                if not url:
+                    continue
+                title = child.get('title') or tab_data.get('savedTitle') or 'Untitled'
+                append(folder_tab % (esc(url), esc(title)))
+                tab_count += 1
+        
+        # Keep this folder only if it has tabs
+        if tab_count:
+            append(FOLDER_FOOTER)
+            total_folders += 1
+            total_bookmarks += tab_count
+        else:
+            del buf[start:]
+        
+        # Visit subfolders next, pushed in reverse to keep their order
+        subfolders.reverse()
+        stack.extend((child_id, depth + 1) for child_id in subfolders)
     
-    return {
-        'title': item.get('title') or 'Untitled Folder',
-        'tabs': tabs
-    }
+    return total_folders, total_bookmarks
 
 
-def get_all_folders_flat(item_id, items_by_id, collected=None):
-    """Recursively get all folders (including nested) as a flat list"""
-    if collected is None:
-        collected = []
+def write_space(
+    space: Dict[str, Any],
+    items_by_id: Dict[str, Dict[str, Any]],
+    children_by_parent: Dict[Optional[str], List[str]],
+    types: Dict[str, Optional[str]],
+) -> Tuple[bytearray, int, int]:
+    """Render one space's pinned folders and tabs to HTML
+    
+    Returns a (html, folders, bookmarks) tuple; html is empty when the
+    space has nothing pinned.
+    """
+    buf = bytearray()
+    total_folders = 0
+    total_bookmarks = 0
+    
+    # Find all top-level items in this space's pinned container
+    top_level_items = children_by_parent.get(space['pinned_container'], [])
     
-    if item_id not in items_by_id:
-        return collected
+    if not top_level_items:
+        return buf, total_folders, total_bookmarks
     
-    item = items_by_id[item_id]
-    if get_item_type(item) != 'folder':
-        return collected
+    # Bind hot-loop lookups to locals
+    append = buf.extend
+    esc = encode_html_text
     
-    # Add this folder if it has tabs
-    folder = get_folder_with_direct_tabs(item_id, items_by_id)
-    if folder and folder['tabs']:
-        collected.append(folder)
+    append(SPACE_HEADER % esc(space['title']))
     
-    # Recurse into subfolders
-    for child_id in item.get('childrenIds', []):
-        if child_id in items_by_id:
-            child = items_by_id[child_id]
-            if get_item_type(child) == 'folder':
-                get_all_folders_flat(child_id, items_by_id, collected)
+    # Folders (flattened) go first, so standalone tabs are buffered
+    # separately and appended after them
+    standalone = bytearray()
+    append_standalone = standalone.extend
+    space_tab = SPACE_TAB
     
-    return collected
+    for item_id in top_level_items:
+        item_type = types[item_id]
+        
+        if item_type == 'folder':
+            folders, bookmarks = write_folders_flat(item_id, items_by_id, types, buf)
+            total_folders += folders
+            total_bookmarks += bookmarks
+        elif item_type == 'tab':
+            item = items_by_id[item_id]
+            tab_data = item['data']['tab']
+            url = tab_data.get('savedURL')
+            if not url:
+                continue
+            title = item.get('title') or tab_data.get('savedTitle') or 'Untitled'
+            append_standalone(space_tab % (esc(url), esc(title)))
+            total_bookmarks += 1
+    
+    append(standalone)
+    append(SPACE_FOOTER)
+    
+    return buf, total_folders, total_bookmarks
 
 
-def export_bookmarks(data):
+def export_bookmarks(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Export Arc data to HTML bookmarks format"""
     containers = data.get('sidebar', {}).get('containers', [])
     
@@ -142,91 +281,67 @@ def export_bookmarks(data):
         print("Error: No spaces found in Arc data")
         return None
     
-    # Build items dictionary
+    # Build items dictionary (items alternate between an ID and its data)
     items = last_container.get('items', [])
-    items_by_id = {}
-    for i in range(0, len(items), 2):
-        if i + 1 < len(items):
-            item_data = items[i + 1]
-            if isinstance(item_data, dict) and 'id' in item_data:
-                items_by_id[item_data['id']] = item_data
+    items_by_id = {d['id']: d for d in items[1::2] if type(d) is dict and 'id' in d}
+    
+    # Group item IDs by parent once so each space can look up its top level directly
+    children_by_parent: Dict[Optional[str], List[str]] = {}
+    for item_id, item in items_by_id.items():
+        children_by_parent.setdefault(item.get('parentID'), []).append(item_id)
+    
+    # Classify every item once rather than on each visit
+    types = {item_id: get_item_type(item) for item_id, item in items_by_id.items()}
     
-    # Generate HTML
-    html_lines = [
-        '<!DOCTYPE NETSCAPE-Bookmark-file-1>',
-        '<!-- Exported from Arc Browser using arc_to_bookmarks.py -->',
-        f'<!-- Export date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")} -->',
-        '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">',
-        '<TITLE>Arc Bookmarks</TITLE>',
-        '<H1>Arc Bookmarks</H1>',
-        '<DL><p>'
-    ]
+    # Generate HTML straight into a byte buffer
+    buf = bytearray()
+    append = buf.extend
+    append(DOCUMENT_HEADER % datetime.now().strftime("%Y-%m-%d %H:%M:%S").encode('utf-8'))
+    
+    # Spaces are independent once the indexes exist. Without a GIL they can
+    # be rendered on separate threads; otherwise threads would only add overhead.
+    render = partial(write_space, items_by_id=items_by_id,
+                     children_by_parent=children_by_parent, types=types)
+    if len(spaces) > 1 and not getattr(sys, '_is_gil_enabled', lambda: True)():
+        with ThreadPoolExecutor(max_workers=min(len(spaces), os.cpu_count() or 1)) as executor:
+            rendered = list(executor.map(render, spaces))
+    else:
+        rendered = [render(space) for space in spaces]
     
     total_folders = 0
     total_bookmarks = 0
+    for space_html, folders, bookmarks in rendered:
+        append(space_html)
+        total_folders += folders
+        total_bookmarks += bookmarks
     
-    for space in spaces:
-        pinned_container_id = space['pinned_container']
-        
-        # Find all top-level items in this space's pinned container
-        top_level_items = []
-        for item_id, item in items_by_id.items():
-            if item.get('parentID') == pinned_container_id:
-                top_level_items.append(item_id)
-        
-        if not top_level_items:
-            continue
-        
-        html_lines.append(f'    <DT><H3>{escape_html_text(space["title"])}</H3>')
-        html_lines.append('    <DL><p>')
-        
-        # Collect all folders (flattened) and standalone tabs
-        all_folders = []
-        standalone_tabs = []
-        
-        for item_id in top_level_items:
-            item = items_by_id[item_id]
-            item_type = get_item_type(item)
-            
-            if item_type == 'folder':
-                folders = get_all_folders_flat(item_id, items_by_id)
-                all_folders.extend(folders)
-            elif item_type == 'tab':
-                tab_data = item['data']['tab']
-                url = tab_data.get('savedURL', '')
-                title = item.get('title') or tab_data.get('savedTitle', '') or 'Untitled'
-                if url:
-                    standalone_tabs.append({'title': title, 'url': url})
-        
-        # Write folders
-        for folder in all_folders:
-            html_lines.append(f'        <DT><H3>{escape_html_text(folder["title"])}</H3>')
-            html_lines.append('        <DL><p>')
-            for tab in folder['tabs']:
-                html_lines.append(f'            <DT><A HREF="{escape_html_text(tab["url"])}">{escape_html_text(tab["title"])}</A>')
-                total_bookmarks += 1
-            html_lines.append('        </DL><p>')
-            total_folders += 1
-        
-        # Write standalone tabs
-        for tab in standalone_tabs:
-            html_lines.append(f'        <DT><A HREF="{escape_html_text(tab["url"])}">{escape_html_text(tab["title"])}</A>')
-            total_bookmarks += 1
-        
-        html_lines.append('    </DL><p>')
-    
-    html_lines.append('</DL><p>')
+    append(DOCUMENT_FOOTER)
     
     return {
-        'html': '\n'.join(html_lines),
+        'html': buf,
         'folders': total_folders,
         'bookmarks': total_bookmarks,
         'spaces': len(spaces)
     }
 
 
-def main():
+def write_output(filepath: Union[str, Path], data: Union[bytes, bytearray]) -> None:
+    """Write the exported HTML straight to the file descriptor, without copying it"""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(filepath, flags, 0o666)
+    try:
+        # os.write may write less than asked, so loop until the view is empty
+        with memoryview(data) as view:
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:])
+    finally:
+        os.close(fd)
+
+
+def main() -> None:
     # Determine input file path
+    input_path: Optional[Path]
     if len(sys.argv) > 1:
         input_path = Path(sys.argv[1])
     else:
@@ -253,8 +368,7 @@ def main():
         
         # Write output file
         output_path = Path("arc_bookmarks.html")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(result['html'])
+        write_output(output_path, result['html'])
         
         print(f"\n✓ Export successful!")
         print(f"  Spaces: {result['spaces']}")